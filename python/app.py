@@ -1,24 +1,40 @@
 # app.py
 import sys
+import logging
+import os
 import matplotlib
-from helpers.timer import Timer
 import time
+import numpy as np
 matplotlib.use("Qt5Agg")
-import matplotlib.pyplot as plt
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
-    QPushButton, QFormLayout, QDoubleSpinBox, QSlider, QSizePolicy, QCheckBox
+    QPushButton, QFormLayout, QDoubleSpinBox, QSlider, QSizePolicy, QCheckBox, QMessageBox
 )
 import qdarktheme
 
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QGuiApplication
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
 
 from model import Model  # Import the Model class from model.py
+from worker import SimulationWorker
+
+log = logging.getLogger(__name__)
 
 class App(QMainWindow):
+    # (modifier, wheel direction) -> (action, amount): Ctrl zooms around the cursor,
+    # Shift pans the time axis and Alt pans the voltage axis by a fraction of the visible range
+    _scroll_actions = {
+        (Qt.ControlModifier, 'up'): ('zoom', 0.9),
+        (Qt.ControlModifier, 'down'): ('zoom', 1.1),
+        (Qt.ShiftModifier, 'up'): ('pan_x', 0.1),
+        (Qt.ShiftModifier, 'down'): ('pan_x', -0.1),
+        (Qt.AltModifier, 'up'): ('pan_y', 0.1),
+        (Qt.AltModifier, 'down'): ('pan_y', -0.1),
+    }
+
     def __init__(self, dark_mode=True):
         
         # init model 
@@ -29,9 +45,10 @@ class App(QMainWindow):
             if hasattr(qdarktheme, 'setup_theme'):
                 qdarktheme.setup_theme()
             else:
-                print("Dark mode not available (pip install pyqtdarktheme). [`qdarktheme` does not work on win11...]")
+                log.warning("Dark mode not available (pip install pyqtdarktheme). [`qdarktheme` does not work on win11...]")
         super().__init__()
-        self.setWindowTitle("Hodgkin–Huxley Simulation")
+        self.window_title = "Hodgkin–Huxley Simulation"
+        self.setWindowTitle(self.window_title)
         self.setGeometry(100, 100, 1280, 1080)
 
         # --- Main Layout ---
@@ -65,11 +82,18 @@ class App(QMainWindow):
         self.reset_button = self._create_button_(text="Reset view", callback=self.reset_view, layout=buttons_layout)
         self.reset_params_button = self._create_button_("Reset Parameters", callback=self.reset_model_params, layout=buttons_layout)
 
+        # spinbox/slider changes are collected and applied once input pauses for 50 ms, so wheel-spinning a
+        # parameter or dragging the window slider costs one model update / one full redraw, not dozens
+        self._pending_params = {}
+        self._param_timer = self._create_debounce_timer_(self._apply_param_updates_)
+        self._window_timer = self._create_debounce_timer_(self._apply_window_size_)
+
         self.neuron_params = self.model.neuron_params
         self.param_spinboxes = {}
         for param, (label, min_val, max_val, default) in self.neuron_params.items():
             self.param_spinboxes[param] = self._create_spinbox_(text=label, layout=form_layout,range= (min_val, max_val), default_value=default)
-            self.param_spinboxes[param].valueChanged.connect(lambda value, p=param: self.update_model_parameter(p, value))
+            self.param_spinboxes[param].setProperty("hh_param", param)
+            self.param_spinboxes[param].valueChanged.connect(self._on_param_changed_)
         
         # buttons_layout.addStretch(1)
         controls_layout.addLayout(buttons_layout)
@@ -85,7 +109,7 @@ class App(QMainWindow):
         self._init_checkboxes_(layout=checkbox_layout)
         
         # --- Plot Canvas ---
-        self.canvas = FigureCanvas(plt.Figure(figsize=(8, 6)))
+        self.canvas = FigureCanvas(Figure(figsize=(8, 6)))
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
         main_layout.addWidget(self.canvas, 1)
@@ -95,6 +119,7 @@ class App(QMainWindow):
         self.ax.set_title("Hodgkin–Huxley Real-Time Simulation", fontsize=18)
         self.ax.grid(True)
         self.ax.set_ylim(-90, 60)
+        self.ax.set_xlim(0, self.windowSlider.value())
         
         self.ax2 = self.ax.twinx()
         self.ax2.set_ylabel("Gating Variables (0-1)", fontsize=16)
@@ -102,47 +127,142 @@ class App(QMainWindow):
         self.ax2.grid(True)
         
         self.canvas.mpl_connect("scroll_event", self.on_scroll)
+        self._pending_scroll = self._new_pending_scroll_()
+        self._scroll_scheduled = False
 
         # --- Simulation State ---
-        self.sim_time = 0.0
-        self.dt = 0.01 # ~75-85 fps with 0.025 ms | 0.05ms ~ 160-170 fps | 0.01 ~ 30 fps
-        self.times = []
-        self.Vs = []
-        self.Y = {'Vs':[], 'm':[], 'h':[], 'n':[]}
+        self.dt = 0.05 # RK4 step (ms); spike timing within ~1e-3 ms of a dt=0.0005 ms reference
 
         self.injection_amplitude = 10.0
         self.injection_duration = 1.0
-        self.injection_end_time = 0.0
 
         self.window_size_ms = self.windowSlider.value()
         self.auto_zoom = True
+        # once the trace reaches the right edge, the time axis jumps ahead by this fraction of its width:
+        # every move is a full redraw (ticks, grid, labels; ~50-100 ms), in between frames are only blitted
+        self.auto_scroll_lead = 0.25
 
-        self.plot_sampling = 10
-        self.simulation_counter = 0
-        self.plot_update_interval = 50
+        self.plot_sampling = 2  # one sample every 0.1 ms
+        self.steady_window = 200  # samples checked by "Inject and Pause"
+        self.plot_update_interval = 33  # ms, ~30 fps repaint
         self.last_plot_update_time = 0.0
-  
-        line_Vs, = self.ax.plot([], [], color='k', lw=1.5, label='V')
+
+        # rolling frame rate shown in the window title (debug runs only, i.e. not under `python -O`)
+        self._fps_ema = 0.0
+        self._last_paint = time.perf_counter()
+        self._last_title_update = self._last_paint
+
+        # lines are animated: full draws skip them and they are blitted on top of the cached background, so
+        # title, labels, ticks and grid are only re-rasterized when limits or the canvas size change
+        line_Vs, = self.ax.plot([], [], color='k', lw=1.5, label='V', animated=True)
         self.ax.legend(loc='upper right')
         
         # shared axis - range (0,1)
-        line_m, = self.ax2.plot([], [], color='r', lw=1.5, label='m')
-        line_h, = self.ax2.plot([], [], color='g', lw=1.5, label='h')
-        line_n, = self.ax2.plot([], [], color='b', lw=1.5, label='n')
+        line_m, = self.ax2.plot([], [], color='r', lw=1.5, label='m', animated=True)
+        line_h, = self.ax2.plot([], [], color='g', lw=1.5, label='h', animated=True)
+        line_n, = self.ax2.plot([], [], color='b', lw=1.5, label='n', animated=True)
         self.ax2.legend(loc='upper left')
         
         # init all lines to plot
         self.lines = {'Vs':line_Vs, 'm':line_m, 'h':line_h, 'n':line_n}
 
+        # blitting: background (axes, grid, labels) is re-captured after every full draw and dropped on resize
+        self._bg = None
+        self.canvas.mpl_connect("draw_event", self._on_draw_)
+
+        # plotted points are decimated to ~2 per horizontal pixel into buffers grown on demand
+        self._canvas_width_px = self.canvas.get_width_height()[0]
+        self._plot_t = np.empty(0)
+        self._plot_Y = np.empty((4, 0), dtype=np.float32)
+        self.canvas.mpl_connect("resize_event", self._on_resize_)
+
+        # the simulation runs on its own thread (waking every timer_interval ms, in step with wall time) and keeps
+        # samples for the longest selectable window in ring buffers; the GUI timer below only repaints
         self.timer_interval = 5  # ms
+        self.worker = SimulationWorker(self.model, self.dt, self.plot_sampling, self.windowSlider.maximum(),
+                                       tick_ms=self.timer_interval, min_capacity=self.steady_window)
+        self.worker.failed.connect(self._on_simulation_failed_)
+        self.worker.start()
+
+        # single-shot precise timer re-armed by update_plot for the remainder of the frame, so paint time
+        # doesn't add to the period and frames don't drift or bunch up on coarse timer resolution
         self.timer = QTimer()
-        self.timer.setInterval(self.timer_interval)
-        self.timer.timeout.connect(self.update_simulation)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.plot_update_interval)
+        self.timer.timeout.connect(self.update_plot)
         self.timer.start()
 
         self.pause_when_steady = False
         self.buttons = None
     
+    def closeEvent(self, event):
+        self.worker.stop()
+        self.worker.wait()
+        super().closeEvent(event)
+
+    def _update_fps_(self):
+        """Updates the frame-rate EMA; the window title is refreshed at most once per second."""
+        now = time.perf_counter()
+        dt_wall = now - self._last_paint
+        self._last_paint = now
+        if dt_wall > 0:
+            self._fps_ema = 0.9 * self._fps_ema + 0.1 / dt_wall
+        if now - self._last_title_update >= 1.0:
+            self._last_title_update = now
+            self.setWindowTitle(f"{self.window_title} ({self._fps_ema:.1f} fps)")
+
+    def _on_resize_(self, event):
+        self._canvas_width_px = self.canvas.get_width_height()[0]
+        # the cached background has the old size; frames redraw until the pending full draw recaptures it
+        self._bg = None
+
+    def _decimate_(self):
+        """
+        Min/max decimation of the buffered samples inside the current time axis to ~2 points per canvas pixel
+        of it (buckets are replaced by their min and max, which keeps spike peaks visible), written into
+        persistent plot buffers that are reused across frames. Returns (times, Y) views of the valid points.
+        """
+        x0, x1 = self.ax.get_xlim()
+        skip, n = self.worker.span(x0, x1)
+        view_samples = int((x1 - x0) / (self.dt * self.plot_sampling))
+        bucket = view_samples // (2 * max(self._canvas_width_px, 1))
+        n_points = n if bucket < 2 else n % bucket + 2 * (n // bucket)
+        if n_points > self._plot_t.shape[0]:
+            self._plot_t = np.empty(n_points)
+            self._plot_Y = np.empty((4, n_points), dtype=np.float32)
+        k = self.worker.decimated(n, bucket, self._plot_t, self._plot_Y, skip)
+        return self._plot_t[:k], self._plot_Y[:, :k]
+
+    def _update_lines_(self):
+        """Re-decimates the lines for the current limits; call after every change of the time axis."""
+        plot_t, plot_Y = self._decimate_()
+        for i, key in enumerate(self.plot_keys):
+            self.lines[key].set_data(plot_t, plot_Y[i])
+
+    def _on_draw_(self, event):
+        """After a full draw: cache the static background and paint the animated lines on top."""
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines_()
+
+    def _draw_lines_(self):
+        for line in self.lines.values():
+            line.axes.draw_artist(line)
+
+    def _blit_(self):
+        """Repaints only the lines over the cached background (falls back to a full draw if there is none)."""
+        if self._bg is None:
+            self._redraw_()
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_lines_()
+        self.canvas.blit(self.ax.bbox)
+
+    def _redraw_(self):
+        """Schedules a full redraw; use whenever a static artist (limits, ticks, labels) changes."""
+        self._bg = None
+        self.canvas.draw_idle()
+
     def _init_checkboxes_(self, layout):
         # Checkboxes to toggle visibility of lines
         self.checkboxes = {}
@@ -155,25 +275,41 @@ class App(QMainWindow):
             if layout:
                 layout.addWidget(self.checkboxes[key])
         
+    def _on_param_changed_(self, value):
+        """Shared slot of the parameter spinboxes; the parameter name is stored on the sending spinbox."""
+        self.update_model_parameter(self.sender().property("hh_param"), value)
+
     def update_model_parameter(self, param, value):
-        setattr(self.model, param, value)
-        print(f"Updated {param} to {value}")
+        """Queues `param` = `value`; the model is updated once the spinboxes settle (see _apply_param_updates_)."""
+        self._pending_params[param] = value
+        self._param_timer.start()
+
+    def _apply_param_updates_(self):
+        for param, value in self._pending_params.items():
+            setattr(self.model, param, value)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Updated %s", ", ".join(f"{param} to {value}" for param, value in self._pending_params.items()))
+        self._pending_params.clear()
         
     def _debug_button_callback_(self):
-        print("Debug button clicked")
+        log.debug("Debug button clicked")
     
     def reset_model_params(self):
         for param, (_, _, _, default) in self.neuron_params.items():
             self.param_spinboxes[param].setValue(default)
             setattr(self.model, param, default)
-        print("Model parameters reset to default values.")
+        # the defaults are already applied; drop the updates queued by setValue
+        self._param_timer.stop()
+        self._pending_params.clear()
+        log.debug("Model parameters reset to default values.")
         
     def toggle_line_visibility(self, key, state):
         if state == Qt.Checked:
             self.lines[key].set_visible(True)
         else:
             self.lines[key].set_visible(False)
-        self.canvas.draw_idle()
+        # the lines are animated (not part of the cached background), so a blit is enough
+        self._blit_()
         
     def _create_slider_(self,
                         text='DefaultText', 
@@ -224,6 +360,14 @@ class App(QMainWindow):
             layout.addWidget(btn)
         return btn
 
+    def _create_debounce_timer_(self, callback, interval_ms=50)->QTimer:
+        """Single-shot timer that calls `callback` once `start()` hasn't been called again for `interval_ms`."""
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(interval_ms)
+        timer.timeout.connect(callback)
+        return timer
+
     def _create_spinbox_(self,
                          text="DefaultSpinBox",
                          callback=None,
@@ -257,13 +401,22 @@ class App(QMainWindow):
             return
    
     def update_window_size(self, value):
+        """Slider callback: the plotted window changes at once, the axis follows once the slider settles."""
         self.window_size_ms = value
         self.auto_zoom = True
-        if self.sim_time > self.window_size_ms:
-            self.ax.set_xlim(self.sim_time - self.window_size_ms, self.sim_time)
-        else:
-            self.ax.set_xlim(0, self.window_size_ms)
-        self.canvas.draw_idle()
+        self._window_timer.start()
+
+    def _apply_window_size_(self):
+        self.ax.set_xlim(self._leading_xlim_(self.worker.sim_time, self.window_size_ms))
+        self._update_lines_()
+        self._redraw_()
+
+    def _leading_xlim_(self, sim_time, width):
+        """Time-axis limits `width` wide that show `sim_time` with `auto_scroll_lead` of the width still ahead of it."""
+        if sim_time <= width:
+            return (0, width)
+        lead = self.auto_scroll_lead * width
+        return (sim_time + lead - width, sim_time + lead)
 
     def on_scroll(self, event):
         if hasattr(event, 'guiEvent') and event.guiEvent is not None:
@@ -271,86 +424,76 @@ class App(QMainWindow):
         else:
             modifiers = QGuiApplication.keyboardModifiers()
 
-        if modifiers & Qt.ControlModifier:
-            if event.button == 'up':
-                zoom_factor = 0.9
-            elif event.button == 'down':
-                zoom_factor = 1.1
-            else:
-                return
-            xlim = self.ax.get_xlim()
-            ylim = self.ax.get_ylim()
-            xdata = event.xdata
-            ydata = event.ydata
-            if xdata is None or ydata is None:
-                return
-            current_width = xlim[1] - xlim[0]
-            new_width = current_width * zoom_factor
-            rel_x = (xdata - xlim[0]) / current_width
-            new_xlim_left = xdata - new_width * rel_x
-            new_xlim_right = new_xlim_left + new_width
-            current_height = ylim[1] - ylim[0]
-            new_height = current_height * zoom_factor
-            rel_y = (ydata - ylim[0]) / current_height
-            new_ylim_bottom = ydata - new_height * rel_y
-            new_ylim_top = new_ylim_bottom + new_height
-            self.ax.set_xlim(new_xlim_left, new_xlim_right)
-            self.ax.set_ylim(new_ylim_bottom, new_ylim_top)
-            self.canvas.draw_idle()
-            self.auto_zoom = False
-            new_x_width = self.ax.get_xlim()[1] - self.ax.get_xlim()[0]
-            self.windowSlider.blockSignals(True)
-            self.windowSlider.setValue(int(new_x_width))
-            self.windowSlider.blockSignals(False)
-        elif modifiers & Qt.ShiftModifier:
-            current_xlim = self.ax.get_xlim()
-            width = current_xlim[1] - current_xlim[0]
-            pan_amount = width * 0.1
-            if event.button == 'up':
-                new_xlim = (current_xlim[0] + pan_amount, current_xlim[1] + pan_amount)
-            elif event.button == 'down':
-                new_xlim = (current_xlim[0] - pan_amount, current_xlim[1] - pan_amount)
-            else:
-                return
-            self.ax.set_xlim(new_xlim)
-            self.canvas.draw_idle()
-            self.auto_zoom = False
-            new_x_width = self.ax.get_xlim()[1] - self.ax.get_xlim()[0]
-            self.windowSlider.blockSignals(True)
-            self.windowSlider.setValue(int(new_x_width))
-            self.windowSlider.blockSignals(False)
-        elif modifiers & Qt.AltModifier:
-            current_ylim = self.ax.get_ylim()
-            height = current_ylim[1] - current_ylim[0]
-            pan_amount = height * 0.1
-            if event.button == 'up':
-                new_ylim = (current_ylim[0] + pan_amount, current_ylim[1] + pan_amount)
-            elif event.button == 'down':
-                new_ylim = (current_ylim[0] - pan_amount, current_ylim[1] - pan_amount)
-            else:
+        # Ctrl takes precedence over Shift, Shift over Alt
+        for modifier in (Qt.ControlModifier, Qt.ShiftModifier, Qt.AltModifier):
+            if modifiers & modifier:
+                break
+        else:
+            return
+        action = self._scroll_actions.get((modifier, event.button))
+        if action is None:
+            return
+
+        kind, amount = action
+        if kind == 'zoom':
+            if event.inaxes is None:
                 return
-            self.ax.set_ylim(new_ylim)
-            self.canvas.draw_idle()
-            self.auto_zoom = False
+            self._pending_scroll['zoom'] *= amount
+            # anchor in self.ax data coordinates (event.ydata would be in the twin axis' units)
+            self._pending_scroll['anchor'] = self.ax.transData.inverted().transform((event.x, event.y))
         else:
+            self._pending_scroll[kind] += amount
+
+        # wheel events that arrive within one event-loop pass are applied together with a single redraw
+        if not self._scroll_scheduled:
+            self._scroll_scheduled = True
+            QTimer.singleShot(0, self._apply_scroll_)
+
+    def _apply_scroll_(self):
+        pending = self._pending_scroll
+        self._pending_scroll = self._new_pending_scroll_()
+        self._scroll_scheduled = False
+
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        if pending['zoom'] != 1.0:
+            factor = pending['zoom']
+            xdata, ydata = pending['anchor']
+            x0, x1 = xdata - (xdata - x0) * factor, xdata + (x1 - xdata) * factor
+            y0, y1 = ydata - (ydata - y0) * factor, ydata + (y1 - ydata) * factor
+        pan_x = (x1 - x0) * pending['pan_x']
+        pan_y = (y1 - y0) * pending['pan_y']
+        xlim, ylim = (x0 + pan_x, x1 + pan_x), (y0 + pan_y, y1 + pan_y)
+        # opposite wheel steps within one pass can cancel out; then keep the view (and the blit cache)
+        if xlim == tuple(self.ax.get_xlim()) and ylim == tuple(self.ax.get_ylim()):
             return
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        self._update_lines_()
+        self._redraw_()
+        self.auto_zoom = False
+        if pending['zoom'] != 1.0 or pending['pan_x']:
+            self._sync_slider_(x1 - x0)
+
+    def _new_pending_scroll_(self):
+        return {'zoom': 1.0, 'anchor': None, 'pan_x': 0.0, 'pan_y': 0.0}
+
+    def _sync_slider_(self, width):
+        """Shows `width` on the window slider without triggering update_window_size."""
+        self.windowSlider.blockSignals(True)
+        self.windowSlider.setValue(int(width))
+        self.windowSlider.blockSignals(False)
 
     def reset_view(self):
-        if self.sim_time > self.window_size_ms:
-            self.ax.set_xlim(self.sim_time - self.window_size_ms, self.sim_time)
-        else:
-            self.ax.set_xlim(0, self.window_size_ms)
+        self.ax.set_xlim(self._leading_xlim_(self.worker.sim_time, self.window_size_ms))
         self.ax.set_ylim(-90, 60)
-        self.canvas.draw_idle()
+        self._update_lines_()
+        self._redraw_()
         self.auto_zoom = True
 
-    def external_current(self, t):
-        return self.injection_amplitude if t < self.injection_end_time else 0.0
-
     def inject_current(self):
         self.injection_amplitude = self.injectionAmplitudeSpinBox.value()
         self.injection_duration = self.injectionDurationSpinBox.value()
-        self.injection_end_time = self.sim_time + self.injection_duration
+        self.worker.inject(self.injection_amplitude, self.injection_duration)
 
     def inject_and_pause(self):
         """
@@ -369,63 +512,80 @@ class App(QMainWindow):
             self.slow_mode_button.setText("Slow Mode: OFF")
     
     def toggle_pause(self):
-        if self.timer.isActive():
+        if not self.worker.paused:
+            self.worker.pause()
+            self._show_paused_(True)
+        else:
+            self.worker.resume()
+            self._show_paused_(False)
+            self.pause_when_steady = False
+
+    def _show_paused_(self, paused):
+        """Puts the repaint timer and the controls in the paused (or running) state."""
+        if paused:
             self.timer.stop()
-            self.pause_button.setText("Resume")
-            self.inject_button.setEnabled(False)
-            self.inject_and_pause_button.setEnabled(False)
         else:
             self.timer.start()
-            self.pause_button.setText("Pause")
-            self.inject_button.setEnabled(True)
-            self.inject_and_pause_button.setEnabled(True)
-            self.pause_when_steady = False
+        self.pause_button.setText("Resume" if paused else "Pause")
+        self.inject_button.setEnabled(not paused)
+        self.inject_and_pause_button.setEnabled(not paused)
+
+    def _on_simulation_failed_(self, message):
+        """The worker discarded a failed chunk and paused itself (see SimulationWorker); show it."""
+        log.warning(message)
+        self._show_paused_(True)
+        self.pause_when_steady = False
+        self._paint_frame_(self.worker.sim_time)
+        QMessageBox.warning(self, "Simulation paused", message)
     
-    def update_simulation(self):
-        steps = int(self.timer_interval / self.dt)
-        for _ in range(steps):
-            I_ext = self.external_current(self.sim_time)
-            self.model.step(self.dt, I_ext)
-            self.sim_time += self.dt
-            self.simulation_counter += 1  
-            if self.simulation_counter % self.plot_sampling == 0:
-                #  init all lines to plot (m,h,n)
-                # todo: make private function
-                self.times.append(self.sim_time)
-                self.Y['Vs'].append(self.model.V)
-                self.Y['m'].append(self.model.m)
-                self.Y['h'].append(self.model.h)
-                self.Y['n'].append(self.model.n)
-                
-        if self.auto_zoom:
-            if self.sim_time > self.window_size_ms:
-                self.ax.set_xlim(self.sim_time - self.window_size_ms, self.sim_time)
-            else:
-                self.ax.set_xlim(0, self.window_size_ms)
+    def update_plot(self):
+        """GUI timer tick: repaints whatever the simulation thread has produced since the last frame."""
+        frame_start = time.perf_counter()
+        sim_time = self.worker.sim_time
+        # nothing new from the simulation thread (e.g. it is still loading the JIT kernels): skip the frame
+        if sim_time != self.last_plot_update_time:
+            if __debug__:
+                self._update_fps_()
+            self._paint_frame_(sim_time)
+
+            # If the "Inject and Pause" flag is set, check for steady state. after 20ms
+            # (only once the worker has simulated past the injection, which may not have started yet)
+            if (self.pause_when_steady and self.worker.simulation_counter >= 20*100*self.plot_sampling
+                    and not self.worker.injection_active):
+                if self.worker.latest_V_range(self.steady_window) < 1.0:
+                    self.toggle_pause()
+                    self.pause_when_steady = False
+
+        if not self.worker.paused:
+            elapsed_ms = (time.perf_counter() - frame_start) * 1000.0
+            self.timer.start(max(0, self.plot_update_interval - int(elapsed_ms)))
+
+    def _paint_frame_(self, sim_time):
+        """Moves the time axis with the simulation if needed and repaints the newest `window_size_ms` of samples."""
+        current_xlim = self.ax.get_xlim()
+        new_xlim = current_xlim
+        # the axis only moves once the trace runs past its right edge (or the auto-zoom window changed size)
+        width = current_xlim[1] - current_xlim[0]
+        if self.auto_zoom and not np.isclose(width, self.window_size_ms):
+            new_xlim = self._leading_xlim_(sim_time, self.window_size_ms)
+        elif sim_time > current_xlim[1]:
+            new_xlim = self._leading_xlim_(sim_time, width)
+        # moving the x-axis needs a full redraw (ticks/grid); otherwise only the lines are re-blitted
+        if tuple(new_xlim) != tuple(current_xlim):
+            self.ax.set_xlim(new_xlim)
+            self._update_lines_()
+            self._redraw_()
         else:
-            current_xlim = self.ax.get_xlim()
-            if self.sim_time > current_xlim[1]:
-                width = current_xlim[1] - current_xlim[0]
-                self.ax.set_xlim(self.sim_time - width, self.sim_time)
-        # todo: make this private function
-        # update all lines to plot
-        self.lines['Vs'].set_data(self.times, self.Y['Vs'])
-        self.lines['m'].set_data(self.times, self.Y['m'])
-        self.lines['h'].set_data(self.times, self.Y['h'])
-        self.lines['n'].set_data(self.times, self.Y['n'])
-        
-        self.canvas.draw_idle()
-        self.last_plot_update_time = self.sim_time
-
-        # If the "Inject and Pause" flag is set, check for steady state. after 20ms
-        if self.pause_when_steady and len(self.Y['Vs']) >= 20*100:
-            recent_V = self.Y['Vs'][-200:]
-            if max(recent_V) - min(recent_V) < 1.0:
-                self.toggle_pause()
-                self.pause_when_steady = False
+            self._update_lines_()
+            self._blit_()
+        self.last_plot_update_time = sim_time
         
 if __name__ == '__main__':
     # This block is not used when imported by main.py.
+    if os.environ.get("HHSIM_DEBUG") == "1":
+        logging.basicConfig()
+        # run directly, this module's logger is "__main__" rather than "app"
+        log.setLevel(logging.DEBUG)
     # qdarktheme.enable_hi_dpi()
     app = QApplication(sys.argv)
     import qdarktheme
@@ -1,18 +1,35 @@
 import time
+from collections import deque
+from contextlib import contextmanager
 class Timer:
-    def __init__(self, elapsed_init=0, text="Default"):
+    def __init__(self, elapsed_init=0, text="Default", verbose=True, history=1024):
         self.elapsed = elapsed_init
         self.start_time = None
         self.text = text
+        # stop() only prints when verbose; pass verbose=False when timing anything hot
+        self.verbose = verbose
+        # the last `history` measured intervals (seconds), e.g. for np.percentile(timer.samples, 99)
+        self.samples = deque(maxlen=history)
         self.start()
 
     def start(self, msg=None)->None:
         self.start_time = time.perf_counter()
-        
+
     def stop(self, msg=None)->None:
         self.elapsed = time.perf_counter() - self.start_time
-        print(f'[Timer] {self.text} elapsed time: {self.elapsed} seconds ({msg})')
-        
+        self.samples.append(self.elapsed)
+        if self.verbose:
+            print(f'[Timer] {self.text} elapsed time: {self.elapsed} seconds ({msg})')
+
+    @contextmanager
+    def measure(self, msg=None):
+        """Times the body of a `with` block (stored in `elapsed` and `samples`, printed only when verbose)."""
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop(msg)
+
     def get_elapsed(self)->float:
         self.elapsed =  time.perf_counter() - self.start_time
-        return self.elapsed
\ No newline at end of file
+        return self.elapsed
@@ -1,13 +1,29 @@
 # main.py
 import sys
+import ctypes
+import logging
+import os
 from PyQt5.QtWidgets import QApplication
 from app import App
 
 def main():
-    app = QApplication(sys.argv)
-    window = App()
-    window.show()
-    sys.exit(app.exec_())
+    # parameter updates etc. are logged at DEBUG level; set HHSIM_DEBUG=1 to see them
+    if os.environ.get("HHSIM_DEBUG") == "1":
+        logging.basicConfig()
+        logging.getLogger("app").setLevel(logging.DEBUG)
+    # Windows' default 15.6 ms timer/sleep resolution makes both the repaint timer and the simulation
+    # thread's ticks irregular; ask for 1 ms while the app runs
+    if sys.platform == "win32":
+        ctypes.windll.winmm.timeBeginPeriod(1)
+    try:
+        app = QApplication(sys.argv)
+        window = App()
+        window.show()
+        status = app.exec_()
+    finally:
+        if sys.platform == "win32":
+            ctypes.windll.winmm.timeEndPeriod(1)
+    sys.exit(status)
 
 if __name__ == '__main__':
     main()
@@ -1,9 +1,12 @@
 # model.py
 import numpy as np
 
+import sim_core
+
+
 class Model:
     def __init__(self):
-        
+
         self.neuron_params = {
             "C_m": ("Membrane Capacitance (µF/cm²):", 0.1, 5.0, 1.0),
             "g_Na": ("Sodium Conductance (mS/cm²):", 50.0, 200.0, 120.0),
@@ -13,7 +16,7 @@ class Model:
             "E_K": ("Potassium Reversal Potential (mV):", -100.0, -50.0, -77.0),
             "E_L": ("Leak Reversal Potential (mV):", -70.0, -30.0, -54.387)
         }
-        
+
         # Hodgkin–Huxley parameters (classic values)
         self.C_m  = self.neuron_params['C_m'][3]
         self.g_Na = self.neuron_params['g_Na'][3]
@@ -23,51 +26,104 @@ class Model:
         self.E_K  = self.neuron_params['E_K'][3]
         self.E_L  = self.neuron_params['E_L'][3]
 
-        # Initial conditions (resting state ~ -65 mV)
+        # State [V, m, h, n] lives in one contiguous array handed to the JIT kernels as-is
+        self._y = np.empty(4)
+
+        # Initial conditions (resting state ~ -65 mV, gates at their steady state)
         self.V = -65.0
-        self.m = self.alpha_m(self.V) / (self.alpha_m(self.V) + self.beta_m(self.V))
-        self.h = self.alpha_h(self.V) / (self.alpha_h(self.V) + self.beta_h(self.V))
-        self.n = self.alpha_n(self.V) / (self.alpha_n(self.V) + self.beta_n(self.V))
+        self.m, self.h, self.n = sim_core.resting_gates(self.V)
+
+        # alpha/beta rates tabulated over V (see sim_core.build_rate_table), built by `warm_up`
+        self._rates = None
+
+    def warm_up(self):
+        """
+        Builds the rate table and loads every JIT kernel. The first JIT call of a process also initializes
+        numba (a few hundred ms even with a warm cache), so the simulation thread calls this before its first
+        tick instead of the GUI thread paying for it at startup.
+        """
+        if self._rates is not None:
+            return
+        self._rates = sim_core.build_rate_table()
+        self.advance(0.05, 0, 0.0, 0, 0.0, 0, 1, np.empty(1), np.empty((4, 1), dtype=np.float32), 0)
+        self.step(0.0, 0.0)
+
+    @property
+    def V(self):
+        return self._y[0]
+
+    @V.setter
+    def V(self, value):
+        self._y[0] = value
+
+    @property
+    def m(self):
+        return self._y[1]
+
+    @m.setter
+    def m(self, value):
+        self._y[1] = value
+
+    @property
+    def h(self):
+        return self._y[2]
+
+    @h.setter
+    def h(self, value):
+        self._y[2] = value
+
+    @property
+    def n(self):
+        return self._y[3]
+
+    @n.setter
+    def n(self, value):
+        self._y[3] = value
+
+    @property
+    def state(self):
+        """[V, m, h, n] as the array the JIT kernels update in place."""
+        return self._y
+
+    @property
+    def params(self):
+        """Current parameters packed in the order the JIT kernels expect."""
+        return (self.C_m, self.g_Na, self.g_K, self.g_L, self.E_Na, self.E_K, self.E_L)
 
     def safe_exp(self, x):
         """Clips x to the range [-50, 50] before applying exp to avoid overflow."""
-        return np.exp(np.clip(x, -50, 50))
+        return sim_core.safe_exp(x)
 
     def alpha_n(self, V):
-        if abs(V + 55) < 1e-6:
-            return 0.1
-        return 0.01 * (V + 55) / (1 - self.safe_exp(-(V + 55) / 10))
+        return sim_core.alpha_n(V)
 
     def beta_n(self, V):
-        return 0.125 * self.safe_exp(-(V + 65) / 80)
+        return sim_core.beta_n(V)
 
     def alpha_m(self, V):
-        if abs(V + 40) < 1e-6:
-            return 1.0
-        return 0.1 * (V + 40) / (1 - self.safe_exp(-(V + 40) / 10))
+        return sim_core.alpha_m(V)
 
     def beta_m(self, V):
-        return 4.0 * self.safe_exp(-(V + 65) / 18)
+        return sim_core.beta_m(V)
 
     def alpha_h(self, V):
-        return 0.07 * self.safe_exp(-(V + 65) / 20)
+        return sim_core.alpha_h(V)
 
     def beta_h(self, V):
-        return 1 / (1 + self.safe_exp(-(V + 35) / 10))
+        return sim_core.beta_h(V)
 
     def step(self, dt, I_ext):
-        """Advances the model by one time step using Euler's method."""
-        dm = self.alpha_m(self.V) * (1 - self.m) - self.beta_m(self.V) * self.m
-        dh = self.alpha_h(self.V) * (1 - self.h) - self.beta_h(self.V) * self.h
-        dn = self.alpha_n(self.V) * (1 - self.n) - self.beta_n(self.V) * self.n
-
-        self.m += dt * dm
-        self.h += dt * dh
-        self.n += dt * dn
-
-        I_Na = self.g_Na * (self.m ** 3) * self.h * (self.V - self.E_Na)
-        I_K  = self.g_K * (self.n ** 4) * (self.V - self.E_K)
-        I_L  = self.g_L * (self.V - self.E_L)
+        """Advances the model by one time step (RK4, sub-stepped like `advance` where the state is stiff; see `sim_core.hh_step`)."""
+        if self._rates is None:
+            self.warm_up()
+        sim_core.step(self._y, dt, I_ext, self.params, self._rates)
 
-        dV = (I_ext - I_Na - I_K - I_L) / self.C_m
-        self.V += dt * dV
+    def advance(self, dt, steps, I_amp, inj_end_step, sim_time, counter, sample_every, out_t, out_Y, head):
+        """
+        Advances the model by `steps` RK4 steps in a single JIT call, injecting `I_amp`
+        until step `inj_end_step`. See `sim_core.advance` for the sampling/return contract.
+        """
+        if self._rates is None:
+            self.warm_up()
+        return sim_core.advance(self._y, dt, steps, I_amp, inj_end_step, sim_time, self.params, self._rates,
+                        counter, sample_every, out_t, out_Y, head)
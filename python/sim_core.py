@@ -0,0 +1,363 @@
+# sim_core.py
+"""JIT-compiled Hodgkin–Huxley kernels (rate functions, RK4 integrator) used by `model.Model`, plus the
+ring-buffer decimation used for plotting."""
+import logging
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    from numba.extending import register_jitable
+except ImportError:
+    logging.getLogger(__name__).warning("Numba not available (pip install numba). Running the integrator in pure Python...")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for `numba.njit` so the kernels still run (slowly) without numba."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    register_jitable = njit
+
+# LLVM fast-math without the no-NaN/no-inf assumptions ('nnan', 'ninf'): the min/max clamps and the caller's
+# finiteness checks must see NaN and inf as IEEE values instead of being folded away
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+# Free functions so numba can compile them in nopython mode; `model.Model` delegates here.
+# The rate functions are written once as plain Python (`register_jitable`: compiled into any jitted caller,
+# ordinary Python functions otherwise) and exported as jitted kernels below; `resting_gates` calls the plain
+# versions so it needs no JIT.
+
+@register_jitable
+def _safe_exp(x):
+    """Clips x to the range [-50, 50] before applying exp to avoid overflow."""
+    # math.exp: same code as np.exp once compiled, but ~4x cheaper on a Python float without numba
+    return math.exp(min(max(x, -50.0), 50.0))
+
+
+@register_jitable
+def _safe_expm1(x):
+    """exp(x) - 1 with x clipped to [-50, 50]; accurate for small x, where 1 - exp(-x) cancels."""
+    return math.expm1(min(max(x, -50.0), 50.0))
+
+
+# alpha_n and alpha_m have the form k * u / (1 - exp(-u)): written with expm1 they stay accurate next to
+# their removable singularity at u = 0, so only u = 0 itself needs the limit (k)
+@register_jitable
+def _alpha_n(V):
+    u = (V + 55) / 10
+    if abs(u) < 1e-8:
+        return 0.1
+    return 0.1 * u / -_safe_expm1(-u)
+
+
+@register_jitable
+def _beta_n(V):
+    return 0.125 * _safe_exp(-(V + 65) / 80)
+
+
+@register_jitable
+def _alpha_m(V):
+    u = (V + 40) / 10
+    if abs(u) < 1e-8:
+        return 1.0
+    return u / -_safe_expm1(-u)
+
+
+@register_jitable
+def _beta_m(V):
+    return 4.0 * _safe_exp(-(V + 65) / 18)
+
+
+@register_jitable
+def _alpha_h(V):
+    return 0.07 * _safe_exp(-(V + 65) / 20)
+
+
+@register_jitable
+def _beta_h(V):
+    return 1 / (1 + _safe_exp(-(V + 35) / 10))
+
+
+_jit = njit(cache=True, fastmath=_FASTMATH)
+safe_exp = _jit(_safe_exp)
+safe_expm1 = _jit(_safe_expm1)
+alpha_n = _jit(_alpha_n)
+beta_n = _jit(_beta_n)
+alpha_m = _jit(_alpha_m)
+beta_m = _jit(_beta_m)
+alpha_h = _jit(_alpha_h)
+beta_h = _jit(_beta_h)
+
+
+def resting_gates(V):
+    """Steady-state gates (m, h, n) at a holding potential V, x_inf = alpha / (alpha + beta), in plain Python."""
+    a_m, b_m = _alpha_m(V), _beta_m(V)
+    a_h, b_h = _alpha_h(V), _beta_h(V)
+    a_n, b_n = _alpha_n(V), _beta_n(V)
+    return a_m / (a_m + b_m), a_h / (a_h + b_h), a_n / (a_n + b_n)
+
+
+# Rate lookup table: the six alpha/beta rates sampled every 0.01 mV over [-100, 100] mV and linearly
+# interpolated, replacing six exp() calls per RHS evaluation. Rows are [a_m, b_m, a_h, b_h, a_n, b_n] so
+# both neighbours of a lookup sit in adjacent cache lines. Voltages outside the grid use the exact rates.
+# The range covers E_Na up to 70 mV plus overshoot. Coarser spacing (0.05-0.1 mV, a table small enough for
+# L1/L2) or stored slopes measured no faster since the RK4 arithmetic dominates, and drift spike times more.
+_RATE_V_MIN = -100.0
+_RATE_V_MAX = 100.0
+_RATE_DV = 0.01
+
+
+@njit(cache=True)
+def build_rate_table():
+    n_points = int(round((_RATE_V_MAX - _RATE_V_MIN) / _RATE_DV)) + 1
+    table = np.empty((n_points, 6), dtype=np.float32)
+    for i in range(n_points):
+        V = _RATE_V_MIN + i * _RATE_DV
+        table[i, 0] = alpha_m(V)
+        table[i, 1] = beta_m(V)
+        table[i, 2] = alpha_h(V)
+        table[i, 3] = beta_h(V)
+        table[i, 4] = alpha_n(V)
+        table[i, 5] = beta_n(V)
+    return table
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def lookup_rates(V, table):
+    """Returns (a_m, b_m, a_h, b_h, a_n, b_n) at V, interpolated from `table`."""
+    x = (V - _RATE_V_MIN) * (1.0 / _RATE_DV)
+    if 0.0 <= x < table.shape[0] - 1:
+        i = int(x)
+        f = x - i
+        return (table[i, 0] + f * (table[i + 1, 0] - table[i, 0]),
+                table[i, 1] + f * (table[i + 1, 1] - table[i, 1]),
+                table[i, 2] + f * (table[i + 1, 2] - table[i, 2]),
+                table[i, 3] + f * (table[i + 1, 3] - table[i, 3]),
+                table[i, 4] + f * (table[i + 1, 4] - table[i, 4]),
+                table[i, 5] + f * (table[i + 1, 5] - table[i, 5]))
+    return alpha_m(V), beta_m(V), alpha_h(V), beta_h(V), alpha_n(V), beta_n(V)
+
+
+# RK4 stays stable while dt times the fastest decay rate of the system stays inside its stability interval
+# (~2.79 on the real axis). Those rates are g / C_m of the conductances actually open and each gate's
+# alpha + beta, which grows exponentially once the cell is hyperpolarized (beta_m ~85/ms at -120 mV).
+# Steps are split so dt * stiffness stays under _RK4_STABLE and V moves at most _RK4_DV_MAX per sub-step
+# (strong injections at low C_m otherwise sweep the rates across their whole range within one step).
+# The estimate can't see the conductances opening during the step, so a result whose gates leave [0, 1]
+# by more than _GATE_TOL is redone with twice the sub-steps; beyond _MAX_SUBSTEPS exponential Euler,
+# which is stable at any step size, takes over.
+_RK4_STABLE = 2.0
+_RK4_DV_MAX = 10.0
+_GATE_TOL = 1e-3
+_MAX_SUBSTEPS = 64
+# every rate is monotonic in V, so over the table's grid each alpha + beta peaks at one of its ends
+_GATE_RATE_MAX = max(max(_alpha_m(V) + _beta_m(V), _alpha_h(V) + _beta_h(V), _alpha_n(V) + _beta_n(V))
+                     for V in (_RATE_V_MIN, _RATE_V_MAX))
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def derivatives(V, m, h, n, I_ext, params, rates):
+    """Right-hand side of the HH equations (rates from the lookup table). Returns (dV, dm, dh, dn)."""
+    C_m, g_Na, g_K, g_L, E_Na, E_K, E_L = params
+    a_m, b_m, a_h, b_h, a_n, b_n = lookup_rates(V, rates)
+
+    dm = a_m * (1 - m) - b_m * m
+    dh = a_h * (1 - h) - b_h * h
+    dn = a_n * (1 - n) - b_n * n
+
+    n2 = n * n
+    I_Na = g_Na * (m * m * m) * h * (V - E_Na)
+    I_K  = g_K * (n2 * n2) * (V - E_K)
+    I_L  = g_L * (V - E_L)
+
+    dV = (I_ext - I_Na - I_K - I_L) / C_m
+    return dV, dm, dh, dn
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def rk4_step(V, m, h, n, dt, I_ext, params, rates):
+    """One classical Runge–Kutta (RK4) step of the HH equations. Returns the updated (V, m, h, n)."""
+    half = 0.5 * dt
+    k1V, k1m, k1h, k1n = derivatives(V, m, h, n, I_ext, params, rates)
+    k2V, k2m, k2h, k2n = derivatives(V + half * k1V, m + half * k1m, h + half * k1h, n + half * k1n, I_ext, params, rates)
+    k3V, k3m, k3h, k3n = derivatives(V + half * k2V, m + half * k2m, h + half * k2h, n + half * k2n, I_ext, params, rates)
+    k4V, k4m, k4h, k4n = derivatives(V + dt * k3V, m + dt * k3m, h + dt * k3h, n + dt * k3n, I_ext, params, rates)
+
+    sixth = dt / 6.0
+    V += sixth * (k1V + 2 * k2V + 2 * k3V + k4V)
+    m += sixth * (k1m + 2 * k2m + 2 * k3m + k4m)
+    h += sixth * (k1h + 2 * k2h + 2 * k3h + k4h)
+    n += sixth * (k1n + 2 * k2n + 2 * k3n + k4n)
+    return V, m, h, n
+
+
+@register_jitable
+def _gate_rate_max(V):
+    """Largest alpha + beta of the three gates at V (the grid-wide bound `_GATE_RATE_MAX` inside the rate table)."""
+    if _RATE_V_MIN <= V <= _RATE_V_MAX:
+        return _GATE_RATE_MAX
+    return max(_alpha_m(V) + _beta_m(V), _alpha_h(V) + _beta_h(V), _alpha_n(V) + _beta_n(V))
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def substeps(V, m, h, n, dt, I_ext, params):
+    """
+    Number of RK4 sub-steps (not rounded) a step of size `dt` from (V, m, h, n) needs. The gate rates are taken
+    at both V and the forward-Euler estimate of V after the step, since a strong injection can carry V well
+    into the stiff range within one step.
+    """
+    C_m, g_Na, g_K, g_L, E_Na, E_K, E_L = params
+    n2 = n * n
+    G_Na = g_Na * (m * m * m) * h
+    G_K = g_K * (n2 * n2)
+    dV = (I_ext - G_Na * (V - E_Na) - G_K * (V - E_K) - g_L * (V - E_L)) / C_m
+    stiffness = max((G_Na + G_K + g_L) / C_m, _gate_rate_max(V), _gate_rate_max(V + dt * dV))
+    return dt * max(stiffness / _RK4_STABLE, abs(dV) / _RK4_DV_MAX)
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def exp_euler_step(V, m, h, n, dt, I_ext, params, rates):
+    """
+    One exponential-Euler (Rush–Larsen) step: with V held, each gate relaxes exactly towards a / (a + b);
+    then with the new gates held, V relaxes exactly towards the conductance-weighted reversal potential.
+    Stable for any dt but only first order, so `hh_step` only uses it where RK4 would need too many sub-steps.
+    """
+    C_m, g_Na, g_K, g_L, E_Na, E_K, E_L = params
+    a_m, b_m, a_h, b_h, a_n, b_n = lookup_rates(V, rates)
+
+    s = a_m + b_m
+    m = a_m / s + (m - a_m / s) * math.exp(-dt * s)
+    s = a_h + b_h
+    h = a_h / s + (h - a_h / s) * math.exp(-dt * s)
+    s = a_n + b_n
+    n = a_n / s + (n - a_n / s) * math.exp(-dt * s)
+
+    n2 = n * n
+    G_Na = g_Na * (m * m * m) * h
+    G_K = g_K * (n2 * n2)
+    g = G_Na + G_K + g_L
+    V_inf = (I_ext + G_Na * E_Na + G_K * E_K + g_L * E_L) / g
+    V = V_inf + (V - V_inf) * math.exp(-dt * g / C_m)
+    return V, m, h, n
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def hh_step(V, m, h, n, dt, I_ext, params, rates):
+    """
+    One step of size `dt` from (V, m, h, n): RK4, split into as many sub-steps as `substeps` asks for (more
+    if the gates leave [0, 1]), or exponential Euler where that would exceed _MAX_SUBSTEPS. Returns the new state.
+    """
+    x = substeps(V, m, h, n, dt, I_ext, params)
+    if x > _MAX_SUBSTEPS:
+        n_sub = 2 * _MAX_SUBSTEPS
+    elif x > 1.0:
+        n_sub = int(math.ceil(x))
+    else:
+        # also a NaN estimate (the state is already lost), rather than an unbounded sub-step count
+        n_sub = 1
+    lo, hi = -_GATE_TOL, 1.0 + _GATE_TOL
+    while n_sub <= _MAX_SUBSTEPS:
+        h_sub = dt / n_sub
+        V1, m1, h1, n1 = V, m, h, n
+        for _ in range(n_sub):
+            V1, m1, h1, n1 = rk4_step(V1, m1, h1, n1, h_sub, I_ext, params, rates)
+        if lo <= m1 <= hi and lo <= h1 <= hi and lo <= n1 <= hi:
+            return V1, m1, h1, n1
+        n_sub *= 2
+    h_sub = dt / _MAX_SUBSTEPS
+    for _ in range(_MAX_SUBSTEPS):
+        V, m, h, n = exp_euler_step(V, m, h, n, h_sub, I_ext, params, rates)
+    return V, m, h, n
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def step(state, dt, I_ext, params, rates):
+    """One step of size `dt` on `state` = [V, m, h, n] (updated in place), see `hh_step`."""
+    state[0], state[1], state[2], state[3] = hh_step(state[0], state[1], state[2], state[3], dt, I_ext, params, rates)
+
+
+@njit(cache=True, fastmath=_FASTMATH, nogil=True)
+def advance(state, dt, steps, I_amp, inj_end_step, sim_time, params, rates,
+             counter, sample_every, out_t, out_Y, head):
+    """
+    Runs `steps` steps of size `dt` (see `hh_step`) on `state` = [V, m, h, n] (updated in place; the four values
+    stay in locals for the whole loop and are stored back once at the end). The injection schedule is
+    in steps: `I_amp` is applied while the step counter is below `inj_end_step`.
+    Every `sample_every`-th step (t, V, m, h, n) is written to the ring buffers `out_t` / `out_Y[:, head]`.
+    Returns (sim_time, counter, new head, number of samples written).
+    """
+    V, m, h, n = state[0], state[1], state[2], state[3]
+    cap = out_t.shape[0]
+    k = 0
+    # the injected steps run as their own phase so I_ext is loop-invariant in both loops
+    n_inj = min(steps, max(0, inj_end_step - counter))
+    for phase_steps, I_ext in ((n_inj, I_amp), (steps - n_inj, 0.0)):
+        for _ in range(phase_steps):
+            V, m, h, n = hh_step(V, m, h, n, dt, I_ext, params, rates)
+            sim_time += dt
+            counter += 1
+            if counter % sample_every == 0:
+                out_t[head] = sim_time
+                out_Y[0, head] = V
+                out_Y[1, head] = m
+                out_Y[2, head] = h
+                out_Y[3, head] = n
+                head += 1
+                if head == cap:
+                    head = 0
+                k += 1
+    state[0], state[1], state[2], state[3] = V, m, h, n
+    return sim_time, counter, head, k
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def decimate_ring(tbuf, ybuf, head, n, bucket, out_t, out_Y):
+    """
+    Min/max decimation of the newest `n` samples of the ring buffers `tbuf` / `ybuf` (ending at `head`)
+    into `out_t` / `out_Y` in chronological order: each bucket of `bucket` samples becomes its min and max
+    (at the bucket's first/last time). The oldest samples that don't fill a whole bucket are copied as
+    they are (all of them when `bucket` < 2). Returns the number of points written.
+    """
+    cap = tbuf.shape[0]
+    n_buckets = n // bucket if bucket >= 2 else 0
+    start = n - n_buckets * bucket
+    i = head - n
+    if i < 0:
+        i += cap
+    k = 0
+    for _ in range(start):
+        out_t[k] = tbuf[i]
+        for c in range(ybuf.shape[0]):
+            out_Y[c, k] = ybuf[c, i]
+        k += 1
+        i += 1
+        if i == cap:
+            i = 0
+    for _ in range(n_buckets):
+        out_t[k] = tbuf[i]
+        last = i + bucket - 1
+        if last >= cap:
+            last -= cap
+        out_t[k + 1] = tbuf[last]
+        for c in range(ybuf.shape[0]):
+            lo = hi = ybuf[c, i]
+            if last > i:
+                # contiguous bucket (all but at most one per call): a branch-free loop the compiler vectorizes
+                for j in range(i + 1, last + 1):
+                    lo = min(lo, ybuf[c, j])
+                    hi = max(hi, ybuf[c, j])
+            else:
+                for j in range(1, bucket):
+                    v = ybuf[c, (i + j) % cap]
+                    lo = min(lo, v)
+                    hi = max(hi, v)
+            out_Y[c, k] = lo
+            out_Y[c, k + 1] = hi
+        k += 2
+        i = last + 1
+        if i == cap:
+            i = 0
+    return k
@@ -0,0 +1,36 @@
+# test_sim_core.py
+import numpy as np
+import pytest
+
+from model import Model
+
+DT = 0.05
+
+
+def run_pulse(amplitude, duration_ms, after_ms=50.0):
+    """Injects `amplitude` for `duration_ms` into a resting model, then lets it recover for `after_ms`; returns the V trace."""
+    model = Model()
+    steps = int(round((duration_ms + after_ms) / DT))
+    out_t, out_Y = np.empty(steps), np.empty((4, steps), dtype=np.float32)
+    model.advance(DT, steps, float(amplitude), int(round(duration_ms / DT)), 0.0, 0, 1, out_t, out_Y, 0)
+    assert np.isfinite(model._y).all()
+    assert np.isfinite(out_Y).all()
+    return out_Y[0]
+
+
+# the injection spinboxes' full range: +-1000 uA/cm^2 for up to 1000 ms
+@pytest.mark.parametrize("amplitude", np.linspace(-1000.0, 1000.0, 9))
+@pytest.mark.parametrize("duration_ms", [1.0, 100.0, 1000.0])
+def test_state_stays_finite_over_the_injection_range(amplitude, duration_ms):
+    run_pulse(amplitude, duration_ms)
+
+
+@pytest.mark.parametrize("amplitude, duration_ms", [(-80.0, 1.0), (-30.0, 100.0), (-100.0, 1.0)])
+def test_recovers_from_hyperpolarizing_pulses(amplitude, duration_ms):
+    V = run_pulse(amplitude, duration_ms, after_ms=200.0)
+    assert abs(V[-1] + 65.0) < 1.0
+
+
+def test_default_pulse_fires_one_spike():
+    V = run_pulse(10.0, 1.0)
+    assert np.count_nonzero((V[:-1] < 0) & (V[1:] >= 0)) == 1
@@ -0,0 +1,203 @@
+# worker.py
+import math
+import threading
+import time
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import sim_core
+
+
+class SimulationWorker(QThread):
+    """
+    Integrates the model on its own thread in real time, waking every `tick_ms` to advance by the wall
+    time elapsed since the previous chunk and writing every `plot_sampling`-th sample (t, V, m, h, n) into ring buffers read by the GUI.
+
+    The ring buffers are allocated once for the longest window the GUI can show (`max_window_ms`);
+    changing the plotted window only changes how many of the newest samples are read back.
+
+    Single producer / single consumer: only this thread writes the buffers and advances `head`/`count`,
+    the GUI thread reads them without locking (at worst the oldest sample of a snapshot is torn, which
+    is harmless for plotting).
+
+    If a chunk fails (the kernels raise, or the state comes out non-finite) it is discarded: the state
+    goes back to where the chunk started, the injection is cancelled, the worker pauses and `failed`
+    is emitted with a description for the GUI thread.
+    """
+
+    failed = pyqtSignal(str)
+
+    def __init__(self, model, dt, plot_sampling, max_window_ms, tick_ms=5, min_capacity=0, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.dt = dt
+        self.plot_sampling = plot_sampling
+        self.tick_ms = tick_ms
+
+        self.sim_time = 0.0
+        self.simulation_counter = 0
+        # `inject` publishes (serial, amplitude, duration in steps) as one tuple; the worker turns a new one
+        # into the (amplitude, end step) it integrates with at the start of its next chunk, so the pulse is
+        # counted from the simulation's own step counter, not one the GUI read mid-chunk
+        self._injection_request = (0, 0.0, 0)
+        self._injection_serial = 0
+        self.injection = (0.0, 0)
+
+        self._running = threading.Event()
+        self._running.set()
+        self._stopping = False
+
+        # times stay float64 (float32 would lose sub-sample resolution after a few minutes of sim time);
+        # the traces are float32 since they are only plotted
+        cap = max(self.samples_in(max_window_ms), min_capacity)
+        self.tbuf = np.empty(cap)
+        self.ybuf = np.empty((4, cap), dtype=np.float32)
+        self.head = 0
+        self.count = 0
+
+    def samples_in(self, window_ms):
+        """Number of buffered samples spanning `window_ms`."""
+        return int(window_ms / (self.dt * self.plot_sampling)) + 1
+
+    def snapshot(self, n=None):
+        """Returns (times, Y) of the newest `n` buffered samples (all of them by default) in chronological order."""
+        tbuf, ybuf, head, count = self.tbuf, self.ybuf, self.head, self.count
+        n = count if n is None else min(n, count)
+        start = head - n
+        if start >= 0:
+            return tbuf[start:head], ybuf[:, start:head]
+        return (np.concatenate((tbuf[start:], tbuf[:head])),
+                np.concatenate((ybuf[:, start:], ybuf[:, :head]), axis=1))
+
+    def span(self, t0, t1):
+        """
+        Locates the buffered samples covering the times [t0, t1], plus the nearest one beyond each end so lines
+        reach the edges of a view. Returns (skip, n): the n samples that precede the newest `skip` (n = 0 if none).
+        """
+        head, count = self.head, self.count
+        if count == 0:
+            return 0, 0
+        # samples are evenly spaced, the i-th newest at t_newest - i * spacing
+        t_newest, spacing = self.tbuf[head - 1], self.dt * self.plot_sampling
+        skip = min(count, max(0, int((t_newest - t1) / spacing)))
+        first = min(count, max(0, math.ceil((t_newest - t0) / spacing) + 1))
+        return skip, max(0, first - skip)
+
+    def decimated(self, n, bucket, out_t, out_Y, skip=0):
+        """
+        Min/max-decimates the `n` buffered samples preceding the newest `skip` (see `span`) in buckets of `bucket`
+        straight from the rings into `out_t` / `out_Y` (no intermediate copy, even when they wrap). Returns the
+        number of points written.
+        """
+        cap, count = self.tbuf.shape[0], self.count
+        skip = min(skip, count)
+        return sim_core.decimate_ring(self.tbuf, self.ybuf, (self.head - skip) % cap, min(n, count - skip),
+                                      bucket, out_t, out_Y)
+
+    def inject(self, amplitude, duration_ms):
+        """
+        Schedules `amplitude` for `duration_ms`, starting with the worker's next chunk. The duration is
+        counted in integration steps so the kernel compares integers instead of float times.
+        """
+        serial = self._injection_request[0] + 1
+        self._injection_request = (serial, float(amplitude), round(duration_ms / self.dt))
+
+    @property
+    def injection_active(self):
+        """True from `inject` until the worker has simulated past the end of that injection."""
+        # the worker updates `injection` before `_injection_serial`, so a matching serial implies a current end step
+        return self._injection_serial != self._injection_request[0] or self.simulation_counter < self.injection[1]
+
+    def latest_V_range(self, n):
+        """
+        Peak-to-peak of the newest `n` V samples, taken on views of the ring (no copy, even when they wrap).
+        Returns nan when there are no samples (n <= 0 or nothing simulated yet).
+        """
+        vbuf, head = self.ybuf[0], self.head
+        n = min(n, self.count)
+        if n <= 0:
+            return float('nan')
+        segments = (vbuf[head - n:head],) if head >= n else (vbuf[head - n:], vbuf[:head])
+        segments = [seg for seg in segments if seg.size]
+        return max(seg.max() for seg in segments) - min(seg.min() for seg in segments)
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def stop(self):
+        """Asks the thread to exit; follow with `wait()`."""
+        self._stopping = True
+        self._running.set()
+
+    def run(self):
+        # load the JIT kernels here rather than on the GUI thread; the wall clock starts once they're ready
+        self.model.warm_up()
+        self.decimated(0, 1, np.empty(0), np.empty((4, 0), dtype=np.float32))
+        # a chunk never covers more than 4 ticks of wall time; beyond that the backlog is dropped
+        max_steps = int(4 * self.tick_ms / self.dt)
+        period = self.tick_ms / 1000.0
+        # loop invariants bound once; only the shared simulation state is read/written through self
+        advance, dt, plot_sampling = self.model.advance, self.dt, self.plot_sampling
+        tbuf, ybuf, cap = self.tbuf, self.ybuf, self.tbuf.shape[0]
+        state, chunk_start = self.model.state, np.empty(4)
+        perf_counter, sleep = time.perf_counter, time.sleep
+        last_tick = perf_counter()
+        while not self._stopping:
+            if self.paused:
+                self._running.wait()
+                last_tick = perf_counter()
+                continue
+
+            # integrate exactly the wall time elapsed since the last chunk (1 ms sim per 1 ms wall),
+            # carrying the sub-step remainder over to the next chunk
+            now = perf_counter()
+            steps = int((now - last_tick) * 1000.0 / dt)
+            if steps > max_steps:
+                steps = max_steps
+                last_tick = now
+            else:
+                last_tick += steps * dt / 1000.0
+
+            if steps:
+                # one JIT call runs all RK4 steps of this chunk (injection: I_amp until the end step);
+                # samples are written straight into the ring buffers starting at self.head
+                serial, amplitude, duration_steps = self._injection_request
+                if serial != self._injection_serial:
+                    self.injection = (amplitude, self.simulation_counter + duration_steps)
+                    self._injection_serial = serial
+                I_amp, inj_end_step = self.injection
+                chunk_start[:] = state
+                try:
+                    sim_time, counter, head, n_samples = advance(
+                        dt, steps, I_amp, inj_end_step, self.sim_time, self.simulation_counter,
+                        plot_sampling, tbuf, ybuf, self.head)
+                    error = None if np.isfinite(state).all() else "the state became non-finite"
+                except Exception as e:  # escaping QThread.run would abort the whole process
+                    error = f"{type(e).__name__}: {e}"
+                if error is not None:
+                    self._fail_(chunk_start, steps, error)
+                    continue
+                self.sim_time, self.simulation_counter, self.head = sim_time, counter, head
+                self.count = min(self.count + n_samples, cap)
+            sleep(period)
+
+    def _fail_(self, chunk_start, steps, error):
+        """
+        Discards a failed chunk of `steps` steps: restores the state it started from, drops the ring slots it
+        may have written over (only the oldest samples of a full ring), then cancels the injection, pauses and reports.
+        """
+        self.model.state[:] = chunk_start
+        self.count = max(0, min(self.count, self.tbuf.shape[0] - (steps // self.plot_sampling + 1)))
+        self.injection = (0.0, 0)
+        self._injection_serial = self._injection_request[0]
+        self.pause()
+        self.failed.emit(f"Simulation paused at t = {self.sim_time:.2f} ms: {error}. "
+                         "The state was restored to before the failing chunk and the injection cancelled.")